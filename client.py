@@ -1,13 +1,16 @@
 # -*- coding: utf-8 -*-
+# 最先导入, 以便统计后续 import 的耗时
+from tools.startup_profile import mark_startup_phase, startup_phase_elapsed, startup_report
 import asyncio
 import websockets
-import json
 import os
 import sys
+import zlib
 import argparse
 from datetime import datetime, timedelta
-from tools.screen_shoot import screen_shot
-from tools.image_tool import image_2_base64
+from tools.screen_shoot import screen_shot, screen_shot_burst
+from tools.image_tool import image_2_base64, encode_burst_frames
+from tools.ws_compression import CONTROL_CODEC, ByteCounter, decode_message, encode_message
 from PyQt6.QtWidgets import (
     QApplication, QInputDialog, QMessageBox, QWidget,
     QVBoxLayout, QLabel, QLineEdit, QDialog, QPushButton
@@ -17,9 +20,17 @@ from PyQt6.QtCore import QEvent, Qt
 PROJECT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../')
 sys.path.append(f"{PROJECT_DIR}/src")
 from tools.log_module import log
+mark_startup_phase("imports")
 
 BETA_CODE_FILE = os.path.join(PROJECT_DIR, "beta_code")
 
+# 连拍限制: 最大帧数, 首帧到末帧的最长时长, 所有帧未压缩数据在内存中的上限,
+# 以及所有帧 Base64 数据的上限(发送时 JSON 序列化会再复制一份)
+MAX_BURST_FRAMES = 30
+MAX_BURST_DURATION_MS = 10 * 1000
+MAX_BURST_BYTES = 128 * 1024 * 1024
+MAX_BURST_ENCODED_BYTES = 32 * 1024 * 1024
+
 def parse_arguments():
     parser = argparse.ArgumentParser(description="WebSocket client script")
     parser.add_argument('--debug', action='store_true', help="Run in debug mode")
@@ -35,7 +46,11 @@ def parse_arguments():
 
 async def send_data(user_id="", uri=None, window=None):
     log.info(f"Starting send_data function for user_id: {user_id}")
+    # 用户输入内测码并点击连接之后才开始计时, 不把人工操作时间算进连接耗时;
+    # 每次调用都重新计时, 上一次超时或内测码无效后重新连接时不包含之前的等待
+    mark_startup_phase("connect_start", replace=True)
     reconnect_start_time = datetime.now()
+    byte_counter = ByteCounter()
     
     while True:
         try:
@@ -46,27 +61,57 @@ async def send_data(user_id="", uri=None, window=None):
                 return "connection_timeout"
 
             log.info(f"Attempting to connect to server at {uri}")
-            async with websockets.connect(uri) as websocket:
+            # 关闭 permessage-deflate: 图片为 PNG 的 base64, 再压缩只浪费 CPU,
+            # 控制消息改用应用层预置字典压缩, 由服务端在 hello 之后确认
+            async with websockets.connect(uri, compression=None) as websocket:
                 reconnect_start_time = datetime.now()
+                codec = None
                 log.info(f"User {user_id} successfully connected to server")
+                if mark_startup_phase("first_connect"):
+                    connect_elapsed = startup_phase_elapsed("connect_start", "first_connect")
+                    log.info(f"Startup timing: {startup_report()}, "
+                             f"time_to_connected={connect_elapsed * 1000:.0f}ms")
                 window.showMessage("Success", "成功连接到服务器")
                 
                 # Send a text message
                 text_data = {
                     "user_id": user_id,
                     "type": "text",
-                    "content": "你好，WebSocket！"
+                    "content": "你好，WebSocket！",
+                    "compression": [CONTROL_CODEC],
                 }
                 log.info(f"Sending initial hello message for user {user_id}")
-                await websocket.send(json.dumps(text_data))
+                payload, raw_size = encode_message(text_data, codec)
+                await websocket.send(payload)
+                byte_counter.record_sent(raw_size, payload)
                 log.info(f"Hello message sent successfully: {text_data}")
                 
                 # Listen for messages
                 while True:
                     log.info(f"Waiting for server message for user {user_id}")
-                    message = await websocket.recv()
+                    payload = await websocket.recv()
+                    try:
+                        data, message = decode_message(payload)
+                    except (zlib.error, UnicodeDecodeError) as e:
+                        log.warning(f"Skipping undecodable binary frame ({len(payload)} bytes): {str(e)}")
+                        continue
+                    byte_counter.record_recv(message, payload)
                     log.info(f"Received raw message: {message}")
-                    data = json.loads(message)
+                    
+                    if data["type"] == "compression":
+                        codec = data.get("codec") if data.get("codec") == CONTROL_CODEC else None
+                        log.info(f"Control message compression negotiated: {codec}")
+                        if codec:
+                            # 确认消息本身按协商好的编码发送, 服务端据此验证双方字典一致
+                            ack_message = {
+                                "user_id": user_id,
+                                "type": "compression",
+                                "codec": codec,
+                            }
+                            payload, raw_size = encode_message(ack_message, codec)
+                            await websocket.send(payload)
+                            byte_counter.record_sent(raw_size, payload)
+                        continue
                     
                     # Add check for user verification failure
                     if data["type"] == "error" and "Invalid user_id" in data.get("message", ""):
@@ -93,12 +138,62 @@ async def send_data(user_id="", uri=None, window=None):
                                 "file_name": f"{current_time}.png",
                             }
                             log.info(f"Sending screenshot for user {user_id}, filename: {current_time}.png")
-                            await websocket.send(json.dumps(screen_shot_message))
+                            payload, raw_size = encode_message(screen_shot_message, codec)
+                            await websocket.send(payload)
+                            byte_counter.record_sent(raw_size, payload)
                             log.info(f"Screenshot sent successfully, size: {len(image_base64_data)} bytes")
+                            log.info(f"Transport bytes: {byte_counter.summary()}")
                             
                         except Exception as e:
                             log.error(f"Error processing screenshot: {str(e)}")
                             raise
+                    elif data["type"] == "screen_burst":
+                        try:
+                            count = max(1, min(int(data.get("count", 1)), MAX_BURST_FRAMES))
+                            interval_ms = max(0, int(data.get("interval_ms", 0)))
+                        except (TypeError, ValueError):
+                            log.warning(f"Ignoring screen_burst request with invalid parameters: {data}")
+                            continue
+                        if count > 1:
+                            interval_ms = min(interval_ms, MAX_BURST_DURATION_MS // (count - 1))
+                        interval = interval_ms / 1000
+                        delta = data.get("delta") is True
+                        log.info(f"Processing screen_burst request for user {user_id}: "
+                                 f"count={count}, interval={interval}s, delta={delta}")
+                        
+                        try:
+                            # 截图在线程中执行, 按绝对时刻调度, 不受事件循环影响
+                            loop = asyncio.get_running_loop()
+                            frames = await loop.run_in_executor(
+                                None, screen_shot_burst, count, interval, None, MAX_BURST_BYTES)
+                            log.info(f"Burst captured {len(frames)} frames")
+                            
+                            encoded_frames = await loop.run_in_executor(
+                                None, encode_burst_frames, frames, delta, None, MAX_BURST_ENCODED_BYTES)
+                            if len(encoded_frames) < len(frames):
+                                log.warning(f"Burst encoded size limit reached, "
+                                            f"sending {len(encoded_frames)} of {len(frames)} frames")
+                            del frames
+                            for encoded_frame in encoded_frames:
+                                capture_time = datetime.fromtimestamp(encoded_frame["timestamp"])
+                                encoded_frame["file_name"] = f"{capture_time.strftime('%Y_%m_%d_%H_%M_%S_%f')}.png"
+                            
+                            burst_message = {
+                                "user_id": user_id,
+                                "type": "image_burst",
+                                "interval_ms": interval_ms,
+                                "delta": delta,
+                                "frames": encoded_frames,
+                            }
+                            payload, raw_size = encode_message(burst_message, codec)
+                            await websocket.send(payload)
+                            byte_counter.record_sent(raw_size, payload)
+                            log.info(f"Burst sent successfully, {len(encoded_frames)} frames, size: {raw_size} bytes")
+                            log.info(f"Transport bytes: {byte_counter.summary()}")
+                            
+                        except Exception as e:
+                            log.error(f"Error processing screen burst: {str(e)}")
+                            raise
                     else:
                         log.warning(f"Received unknown message type '{data.get('type')}' from server: {data}")
         
@@ -343,6 +438,7 @@ if __name__ == "__main__":
             import AppKit
             AppKit.NSApp.setActivationPolicy_(AppKit.NSApplicationActivationPolicyRegular)
         
+        mark_startup_phase("qt_init")
         log.info("QApplication 已初始化")
         window = MainWindow()
         dialog = CustomInputDialog()
@@ -1,8 +1,47 @@
+# 最先导入, 导入时刻即启动计时的起点; runtime hook 与 client.py 运行在同一解释器中
+from tools.startup_profile import mark_startup_phase
 import os
 import sys
-import logging
+import json
 import shutil
 
+# 记录已完成的一次性准备工作, 只保存当前构建版本的记录.
+# 放在用户缓存目录而不是 .app 包内: 避免破坏签名, 且 /Applications 下可能不可写
+MANIFEST_PATH = os.path.expanduser('~/Library/Caches/CalfTool/runtime_manifest.json')
+
+# 用于抽查清理结果的框架, 清理后其 Resources 与 Versions/Current 都不应存在
+SENTINEL_FRAMEWORK = 'lib/QtCore.framework'
+
+def get_build_id(qt_path):
+    # 以可执行文件的大小、修改时间和 Qt 目录的实际路径标识构建版本,
+    # 重新打包或把同一构建复制/解压到别处后都会变化
+    stat = os.stat(sys.executable)
+    return f"{stat.st_size}-{int(stat.st_mtime)}-{os.path.realpath(qt_path)}"
+
+def load_manifest(manifest_path):
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+def frameworks_cleaned(qt_path):
+    # 只检查一个已知框架, 远比完整 os.walk 便宜; 框架不存在时无法判断, 视为未清理
+    framework_path = os.path.join(qt_path, SENTINEL_FRAMEWORK)
+    if not os.path.isdir(framework_path):
+        return False
+    return not (os.path.lexists(os.path.join(framework_path, 'Resources'))
+                or os.path.lexists(os.path.join(framework_path, 'Versions', 'Current')))
+
+def save_manifest(manifest_path, manifest):
+    try:
+        os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+    except OSError:
+        pass
+
 def setup_runtime():
     # 设置正确的工作目录
     if getattr(sys, 'frozen', False):
@@ -12,25 +51,17 @@ def setup_runtime():
             application_path = os.path.dirname(os.path.dirname(os.path.dirname(application_path)))
         os.chdir(application_path)
     
-    # 确保日志目录存在
-    log_dir = os.path.join(os.path.dirname(sys.executable), 'logs')
-    if not os.path.exists(log_dir):
-        try:
-            os.makedirs(log_dir)
-        except Exception:
-            pass
-    
-    # 设置基本的日志记录
-    logging.basicConfig(
-        filename=os.path.join(log_dir, 'app.log'),
-        level=logging.DEBUG,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    
     # Handle PyQt6 resources for macOS
     if sys.platform == 'darwin' and getattr(sys, 'frozen', False):
         qt_path = os.path.join(os.path.dirname(sys.executable), '_internal/PyQt6/Qt6')
-        if os.path.exists(qt_path):
+        manifest = load_manifest(MANIFEST_PATH)
+        already_cleaned = (
+            os.path.exists(qt_path)
+            and manifest.get('build_id') == get_build_id(qt_path)
+            and manifest.get('qt_frameworks_cleaned') is True
+            and frameworks_cleaned(qt_path)
+        )
+        if not already_cleaned and os.path.exists(qt_path):
             def clean_framework_dir(framework_path):
                 try:
                     # Clean up framework symlinks and directories
@@ -51,14 +82,25 @@ def setup_runtime():
                             os.unlink(current_link)
                         else:
                             shutil.rmtree(current_link)
+                    return True
                 except (OSError, IOError) as e:
-                    pass
+                    return False
 
             # Process all framework directories
+            cleaned = True
             for root, dirs, files in os.walk(qt_path):
                 for dir_name in dirs:
                     if dir_name.endswith('.framework'):
                         framework_path = os.path.join(root, dir_name)
-                        clean_framework_dir(framework_path)
+                        cleaned = clean_framework_dir(framework_path) and cleaned
+
+            # 只有全部清理成功才记录, 失败时下次启动重试
+            if cleaned:
+                save_manifest(MANIFEST_PATH, {
+                    'build_id': get_build_id(qt_path),
+                    'qt_frameworks_cleaned': True,
+                })
+
+    mark_startup_phase("runtime_hook")
 
-setup_runtime() 
\ No newline at end of file
+setup_runtime()
\ No newline at end of file
@@ -0,0 +1,50 @@
+import hashlib
+import zlib
+
+import pytest
+
+from tools.ws_compression import CONTROL_CODEC, CONTROL_DICT, decode_message, encode_message
+
+# 预置字典是与服务端约定的线路格式, 修改字典必须同时升级 CONTROL_CODEC 并更新这里的哈希
+PINNED_DICTS = {
+    "zlib-dict-v2": "02c9f3582b58f04973f58b2314bf054d1ec9add5c329a1b396ad97188852717c",
+}
+
+
+def test_control_dict_matches_codec_version():
+    assert CONTROL_CODEC in PINNED_DICTS
+    assert hashlib.sha256(CONTROL_DICT).hexdigest() == PINNED_DICTS[CONTROL_CODEC]
+
+
+@pytest.mark.parametrize("message", [
+    {"user_id": "u1", "type": "text", "content": "你好，WebSocket！", "compression": [CONTROL_CODEC]},
+    {"user_id": "u1", "type": "compression", "codec": CONTROL_CODEC},
+    {"type": "error", "message": "Invalid user_id"},
+])
+def test_control_message_round_trip(message):
+    payload, raw_size = encode_message(message, CONTROL_CODEC)
+    assert isinstance(payload, bytes)
+    assert len(payload) < raw_size
+    assert decode_message(payload)[0] == message
+
+
+def test_image_message_not_compressed():
+    message = {"user_id": "u1", "type": "image", "content": "aGVsbG8=", "file_name": "a.png"}
+    payload, raw_size = encode_message(message, CONTROL_CODEC)
+    assert isinstance(payload, str)
+    assert len(payload) == raw_size
+    assert decode_message(payload)[0] == message
+
+
+def test_uncompressed_without_codec():
+    message = {"user_id": "u1", "type": "text", "content": "hi"}
+    payload, _ = encode_message(message)
+    assert isinstance(payload, str)
+
+
+def test_invalid_binary_frame():
+    with pytest.raises(zlib.error):
+        decode_message(b"not zlib data")
+    compressor = zlib.compressobj(zdict=CONTROL_DICT)
+    with pytest.raises(UnicodeDecodeError):
+        decode_message(compressor.compress(b"\xff\xfe") + compressor.flush())
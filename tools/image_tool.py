@@ -1,6 +1,8 @@
 import base64
+import io
 import os
-from PIL import Image
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageChops
 def image_2_base64(image_path):
     with open(image_path, "rb") as image_file:
         # 读取二进制数据
@@ -60,4 +62,65 @@ def crop_image(image_path, left, top, width, height):
             return new_image_path
     except Exception as e:
         print(f"Error cropping image: {e}")
-        return None
\ No newline at end of file
+        return None
+
+def pil_image_2_base64(img, format="PNG"):
+    """
+    将内存中的 PIL 图像编码为 Base64 字符串.
+
+    :param img: PIL.Image, 图像
+    :param format: str, 编码格式
+    :return: str, Base64 编码的图片数据
+    """
+    buffer = io.BytesIO()
+    img.save(buffer, format=format)
+    return base64.b64encode(buffer.getvalue()).decode('utf-8')
+
+
+def encode_burst_frames(frames, delta=False, max_workers=None, max_encoded_bytes=None):
+    """
+    并行编码连拍帧, 差分计算与 PNG 编码都在线程池中执行.
+
+    :param frames: list, [(截图时间戳, PIL.Image), ...]
+    :param delta: bool, 为 True 时除第一帧外只编码相对上一帧发生变化的区域
+    :param max_workers: int, 编码线程数, None 时取 CPU 核数
+    :param max_encoded_bytes: int, 所有帧 Base64 数据的总上限, 超出后丢弃该帧及之后的帧.
+           按批提交任务, 超出后不再提交, 峰值内存约为上限加一批帧的编码结果
+    :return: list, [{"timestamp", "content", "bbox"}, ...], bbox 为变化区域
+             (left, top, right, bottom), 完整帧为 None, 无变化时 content 为空.
+             超出上限时只返回前面的帧, 至少保留第一帧
+    """
+    if not frames:
+        return []
+
+    def encode(i):
+        timestamp, img = frames[i]
+        bbox = None
+        if delta and i > 0:
+            prev = frames[i - 1][1]
+            if prev.size == img.size:
+                # 已是 RGB 时不再复制; 差分图只在本任务内存在
+                prev_rgb = prev if prev.mode == "RGB" else prev.convert("RGB")
+                img_rgb = img if img.mode == "RGB" else img.convert("RGB")
+                bbox = ImageChops.difference(prev_rgb, img_rgb).getbbox() or (0, 0, 0, 0)
+        if bbox is None:
+            content = pil_image_2_base64(img)
+        elif bbox == (0, 0, 0, 0):
+            content = ""
+        else:
+            content = pil_image_2_base64(img.crop(bbox))
+        return {"timestamp": timestamp, "content": content, "bbox": bbox}
+
+    # Pillow 在差分和 PNG 编码时会释放 GIL, 线程池即可并行
+    workers = max_workers or min(len(frames), os.cpu_count() or 1)
+    encoded_frames = []
+    total_bytes = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for start in range(0, len(frames), workers):
+            batch = range(start, min(start + workers, len(frames)))
+            for encoded_frame in executor.map(encode, batch):
+                total_bytes += len(encoded_frame["content"])
+                if max_encoded_bytes is not None and encoded_frames and total_bytes > max_encoded_bytes:
+                    return encoded_frames
+                encoded_frames.append(encoded_frame)
+    return encoded_frames
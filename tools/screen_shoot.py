@@ -14,3 +14,36 @@ def screen_shot(image_dir, region_=None):
   raw_image_path = f"{image_dir}/{cur_time}.png"
   screen_image.save(raw_image_path)
   return raw_image_path
+
+
+def screen_shot_burst(count, interval, region_=None, max_bytes=None):
+  """
+  按固定间隔连续截取多帧, 帧保存在内存中, 不落盘.
+
+  :param count: int, 帧数
+  :param interval: float, 帧间隔(秒), 按起始时刻计算绝对截止时间, 误差不累积
+  :param region_: tuple, 截图区域, None 表示全屏
+  :param max_bytes: int, 所有帧未压缩数据的内存上限, 超出时减少帧数
+  :return: list, [(截图时间戳(截图前后时刻的中点), PIL.Image), ...]
+  """
+  frames = []
+  start = time.perf_counter()
+  for i in range(count):
+    delay = start + i * interval - time.perf_counter()
+    if delay > 0:
+      time.sleep(delay)
+    # macOS 上截图要启动 screencapture 子进程, 耗时可达数百毫秒,
+    # 取截图前后两个时刻的中点作为截图时间戳
+    before = time.time()
+    if region_ is None:
+      screen_image = pyautogui.screenshot()
+    else:
+      screen_image = pyautogui.screenshot(region = region_)
+    timestamp = (before + time.time()) / 2
+    frames.append((timestamp, screen_image))
+    if i == 0 and max_bytes is not None:
+      frame_bytes = screen_image.width * screen_image.height * len(screen_image.getbands())
+      count = min(count, max(1, max_bytes // frame_bytes))
+    if len(frames) >= count:
+      break
+  return frames
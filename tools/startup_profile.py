@@ -0,0 +1,43 @@
+import time
+
+# 打包运行时由 runtime_hook.py 最先导入, 以 runtime hook 开始时刻为起点;
+# 源码运行时由 client.py 最先导入
+START_TIME = time.perf_counter()
+
+_phases = {}
+
+
+def mark_startup_phase(phase, replace=False):
+    """
+    记录启动阶段完成的时刻, 同一阶段默认只记录第一次(例如重连时的 first_connect).
+
+    :param phase: str, 阶段名
+    :param replace: bool, 为 True 时覆盖已记录的时刻
+    :return: bool, 本次是否记录
+    """
+    if phase in _phases and not replace:
+        return False
+    _phases[phase] = time.perf_counter() - START_TIME
+    return True
+
+
+def startup_phase_elapsed(start_phase, end_phase):
+    """
+    计算两个启动阶段之间的耗时.
+
+    :param start_phase: str, 起始阶段名
+    :param end_phase: str, 结束阶段名
+    :return: float, 耗时(秒), 任一阶段未记录时返回 None
+    """
+    if start_phase not in _phases or end_phase not in _phases:
+        return None
+    return _phases[end_phase] - _phases[start_phase]
+
+
+def startup_report():
+    """
+    生成启动耗时报告.
+
+    :return: str, 各阶段距启动起点的累计耗时
+    """
+    return ", ".join(f"{phase}={elapsed * 1000:.0f}ms" for phase, elapsed in _phases.items())
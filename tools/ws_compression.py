@@ -0,0 +1,99 @@
+import json
+import zlib
+
+# 应用层压缩编码名, 在 hello 消息中向服务端声明, 服务端确认后才启用
+CONTROL_CODEC = "zlib-dict-v2"
+
+# 控制/文本消息共享的预置字典: 收录消息中反复出现的键名和取值,
+# 小消息也能获得可观的压缩率. 修改内容时必须同步更新 CONTROL_CODEC 的版本号
+CONTROL_DICT = (
+    b'{"user_id": "", "type": "text", "content": "", "message": "", '
+    b'"type": "error", "type": "compression", "codec": "zlib-dict-v2", '
+    b'"compression": ["zlib-dict-v2"], "type": "screen_shoot", '
+    b'"type": "image", "file_name": ".png", "Invalid user_id", '
+    b'"type": "screen_burst", "count": , "interval_ms": , "delta": true}'
+)
+
+# 图片等已压缩数据不再压缩, 直接以文本帧发送
+UNCOMPRESSED_TYPES = {"image", "image_burst"}
+
+
+def should_compress(message):
+    """
+    判断消息是否值得压缩.
+
+    :param message: dict, 待发送的消息
+    :return: bool, 控制/文本消息返回 True, 图片消息返回 False
+    """
+    return message.get("type") not in UNCOMPRESSED_TYPES
+
+
+def encode_message(message, codec=None):
+    """
+    按压缩策略编码消息.
+
+    :param message: dict, 待发送的消息
+    :param codec: str, 与服务端协商好的编码名, 未协商时为 None
+    :return: tuple, (发送给 websocket 的数据 str 或 bytes, 压缩前的字节数)
+    """
+    # json.dumps 默认 ensure_ascii=True, 输出为纯 ASCII, 字符数即字节数,
+    # 图片消息无需为统计长度再做一次 UTF-8 编码
+    text = json.dumps(message)
+    if codec == CONTROL_CODEC and should_compress(message):
+        compressor = zlib.compressobj(level=9, zdict=CONTROL_DICT)
+        return compressor.compress(text.encode("ascii")) + compressor.flush(), len(text)
+    return text, len(text)
+
+
+def decode_message(payload):
+    """
+    解码服务端消息, 二进制帧按预置字典解压, 文本帧原样解析.
+
+    :param payload: str 或 bytes, websocket.recv() 的返回值
+    :return: tuple, (解析后的 dict, 解压后的文本)
+    :raises zlib.error: 二进制帧不是按 CONTROL_CODEC 压缩的数据
+    :raises UnicodeDecodeError: 解压后的数据不是 UTF-8 文本
+    """
+    if isinstance(payload, bytes):
+        decompressor = zlib.decompressobj(zdict=CONTROL_DICT)
+        text = (decompressor.decompress(payload) + decompressor.flush()).decode("utf-8")
+    else:
+        text = payload
+    return json.loads(text), text
+
+
+def wire_size(payload):
+    """
+    计算实际在线路上传输的负载字节数.
+
+    :param payload: str 或 bytes
+    :return: int, 字节数
+    """
+    if isinstance(payload, bytes):
+        return len(payload)
+    return len(payload.encode("utf-8"))
+
+
+class ByteCounter:
+    """记录收发的原始字节数与线路字节数, 用于评估压缩效果."""
+
+    def __init__(self):
+        self.sent_raw = 0
+        self.sent_wire = 0
+        self.recv_raw = 0
+        self.recv_wire = 0
+
+    def record_sent(self, raw_size, payload):
+        # encode_message 产生的文本帧为纯 ASCII, 直接取长度即可
+        self.sent_raw += raw_size
+        self.sent_wire += len(payload)
+
+    def record_recv(self, text, payload):
+        self.recv_raw += len(text.encode("utf-8"))
+        self.recv_wire += wire_size(payload)
+
+    def summary(self):
+        return (
+            f"sent {self.sent_wire}/{self.sent_raw} bytes (wire/raw), "
+            f"received {self.recv_wire}/{self.recv_raw} bytes (wire/raw)"
+        )